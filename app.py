@@ -1,16 +1,24 @@
 import streamlit as st
-import geopandas as gpd
+import streamlit.components.v1 as components
 import pandas as pd
-import folium
-from folium.plugins import MarkerCluster
-from folium.features import DivIcon
-from shapely.geometry import Point
-import osmnx as ox
-import requests
-from streamlit_folium import st_folium
 import openai
-import math
+import logging
 import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import assets
+import guides
+import itinerary
+import map_render
+import recommend
+import review_index
+import routing
+import session_utils
+import warmup
+import workers
+
+logger = logging.getLogger("cheongpung")
 
 # ✅ 환경변수 불러오기 (Streamlit Cloud 호환에 저장된 키 사용)
 # ──────────────────────────────
@@ -18,16 +26,21 @@ MAPBOX_TOKEN = st.secrets["MAPBOX_TOKEN"]
 openai.api_key = st.secrets["OPENAI_API_KEY"]
 
 # ──────────────────────────────
-# ✅ 데이터 로드 (안전한 로드)
+# ✅ 예열: 프로세스 시작 시 백그라운드에서 자원·캐시 채우기 (python warmup.py --status 로 확인)
+# ──────────────────────────────
+@st.cache_resource
+def start_warmup():
+    client = openai.OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
+    return warmup.Warmup(token=MAPBOX_TOKEN, client=client).start()
+
+warm = start_warmup()
+
+# ──────────────────────────────
+# ✅ 데이터 로드 (안전한 로드, 프로세스 단위 캐시)
 # ──────────────────────────────
-@st.cache_data
 def load_data():
     try:
-        gdf = gpd.read_file("cb_tour.shp").to_crs(epsg=4326)
-        gdf["lon"], gdf["lat"] = gdf.geometry.x, gdf.geometry.y
-        boundary = gpd.read_file("cb_shp.shp").to_crs(epsg=4326)
-        data = pd.read_csv("cj_data_final.csv", encoding="cp949").drop_duplicates()
-        return gdf, boundary, data
+        return assets.load_sites(), assets.load_boundary(), assets.load_reviews()
     except Exception as e:
         st.error(f"❌ 데이터 로드 실패: {str(e)}")
         return None, None, None
@@ -38,6 +51,19 @@ gdf, boundary, data = load_data()
 if gdf is None:
     st.stop()
 
+# 리뷰 인덱스: 미리 빌드된 파일(python review_index.py)이 없으면 한 번만 즉석 생성
+def load_review_index():
+    try:
+        return assets.load_review_index()
+    except Exception as e:
+        st.warning(f"리뷰 인덱스 로드 실패: {str(e)}")
+        return None
+
+reviews_idx = load_review_index()
+
+# 경유지 추천용 카탈로그 (평점·이동시간 행렬)
+catalog = assets.load_catalog()
+
 # csv 파일에 카페 있을때 출력 / 카페 포맷 함수
 def format_cafes(cafes_df):
     try:
@@ -50,7 +76,7 @@ def format_cafes(cafes_df):
                    "지도를 활용해 천천히 걸어보시는 것도 추천드립니다 😊")
         elif len(cafes_df) == 1:
             row = cafes_df.iloc[0]
-            if all(x not in str(row["c_review"]) for x in ["없음", "없읍"]):
+            if pd.notna(row["c_review"]) and review_index.is_valid_review(row["c_review"]):
                 return f" **{row['c_name']}** (⭐ {row['c_value']}) \n\"{row['c_review']}\""
             else:
                 return f"**{row['c_name']}** (⭐ {row['c_value']})"
@@ -59,9 +85,7 @@ def format_cafes(cafes_df):
             result.append("**주변의 평점 높은 카페들은 여기 있어요!** 🌼\n")
             
             for (name, value), group in grouped:
-                reviews = group['c_review'].dropna().unique()
-                reviews = [r for r in reviews if all(x not in str(r) for x in ["없음", "없읍"])]
-                top_reviews = reviews[:3]
+                top_reviews = review_index.top_reviews(reviews_idx, "c", name, k=3, within=group['c_review'])
                 
                 if top_reviews:
                     review_text = "\n".join([f"\"{r}\"" for r in top_reviews])
@@ -79,10 +103,12 @@ def format_cafes(cafes_df):
 # ──────────────────────────────
 DEFAULTS = {
     "order": [],
-    "segments": [],
+    "leg_keys": [],
+    "legs": {},
+    "route_totals": {"duration": 0.0, "distance": 0.0},
     "duration": 0.0,
     "distance": 0.0,
-    "messages": [{"role": "system", "content": "당신은 청주 문화관광 전문 가이드입니다."}],
+    "guides": {},
     "auto_gpt_input": ""
 }
 
@@ -90,6 +116,38 @@ for k, v in DEFAULTS.items():
     if k not in st.session_state:
         st.session_state[k] = v
 
+# 구간 좌표는 모든 세션이 공유하는 저장소에 두고, 세션에는 구간 키만 보관
+route_store = routing.get_route_store()
+
+# 작업 프로세스 풀: 지도 HTML 생성·경계 단순화는 다른 코어에서, 같은 구간 요청은 하나로 합침
+# (만들기에 실패하면 캐시하지 않고, workers.RETRY_AFTER 초 뒤에 다시 시도)
+@st.cache_resource
+def pool_failures():
+    return {"at": 0.0}
+
+@st.cache_resource
+def get_worker_pool():
+    sites = gdf.dropna(subset=["lat", "lon"])
+    return workers.WorkerPool(sites[["lat", "lon"]].to_numpy(),
+                              sites["name"].astype(str).tolist(),
+                              boundary.geometry.to_wkb().tolist())
+
+def drop_worker_pool(pool, error):
+    """작업 프로세스가 죽어 망가진 풀은 버리고 다음 실행 때 새로 만듭니다."""
+    logger.warning("작업 풀 오류, 앱 스레드에서 직접 처리합니다: %s", error)
+    if isinstance(error, BrokenProcessPool):
+        pool.shutdown()
+        get_worker_pool.clear()
+
+worker_pool = None
+if time.time() - pool_failures()["at"] >= workers.RETRY_AFTER:
+    try:
+        worker_pool = get_worker_pool()
+    except Exception as pool_error:
+        pool_failures()["at"] = time.time()
+        logger.warning("작업 풀을 만들 수 없어 %d초 동안 앱 스레드에서 직접 처리합니다: %r",
+                       workers.RETRY_AFTER, pool_error)
+
 # ──────────────────────────────
 # ✅ 페이지 설정 & 스타일
 # ──────────────────────────────
@@ -415,6 +473,34 @@ st.markdown('''
 <div class="title-underline"></div>
 ''', unsafe_allow_html=True)
 
+# ──────────────────────────────
+# ✅ 공유된 일정 불러오기 (?itinerary=<id>) - 경로·GPT 호출 없이 바로 표시
+# ──────────────────────────────
+shared_id = st.query_params.get("itinerary")
+if shared_id and st.session_state.get("loaded_itinerary") != shared_id:
+    st.session_state["loaded_itinerary"] = shared_id
+    bundle = itinerary.load_bundle(shared_id)
+    if bundle is None:
+        st.warning("⚠️ 공유된 일정을 찾을 수 없습니다.")
+    else:
+        legs = {}
+        for key, leg in itinerary.bundle_legs(bundle):
+            route_store.put(key, leg)
+            legs[key] = (leg["duration"], leg["distance"])
+        guides.put_intros(bundle.get("guides", {}))
+        st.session_state["legs"] = legs
+        st.session_state["leg_keys"] = list(legs)
+        st.session_state["route_totals"] = {"duration": bundle["duration"], "distance": bundle["distance"]}
+        st.session_state["order"] = bundle["order"]
+        st.session_state["duration"] = bundle["duration"] / 60
+        st.session_state["distance"] = bundle["distance"] / 1000
+        st.session_state["guides"] = bundle.get("guides", {})
+        
+        if all(n in set(gdf["name"].dropna()) for n in bundle["order"]):
+            st.session_state["mode_key"] = "도보" if bundle["mode"] == "walking" else "운전자"
+            st.session_state["start_key"] = bundle["order"][0]
+            st.session_state["wps_key"] = bundle["order"][1:]
+
 # ──────────────────────────────
 # ✅ 메인 레이아웃 (3컬럼)
 # ──────────────────────────────
@@ -432,6 +518,21 @@ with col1:
     st.markdown("**출발지**")
     start = st.selectbox("", gdf["name"].dropna().unique(), key="start_key", label_visibility="collapsed")
     
+    st.markdown("**여행 시간**")
+    budget = st.slider("", 60, 480, 180, step=30, format="%d분", key="budget_key", label_visibility="collapsed")
+
+    def apply_recommendation():
+        api_mode = "walking" if st.session_state.get("mode_key") == "도보" else "driving"
+        rec = recommend.recommend_waypoints(catalog, st.session_state.get("start_key"),
+                                            st.session_state.get("budget_key", 180), api_mode)
+        st.session_state["recommended"] = rec.to_dict("records")
+        st.session_state["wps_key"] = rec["name"].tolist()
+
+    st.button("✨ 경유지 추천", on_click=apply_recommendation)
+    for i, r in enumerate(st.session_state.get("recommended", []), 1):
+        rating = "-" if pd.isna(r["rating"]) else f"{r['rating']:.1f}"
+        st.caption(f"{i}. {r['name']} · ⭐ {rating} · 출발지에서 약 {r['minutes']:.0f}분")
+
     st.markdown("**경유지**")
     wps = st.multiselect("", [n for n in gdf["name"].dropna().unique() if n != st.session_state.get("start_key", "")], key="wps_key", label_visibility="collapsed")
     
@@ -446,21 +547,29 @@ with col1:
 # ------------------------------
 if clear_clicked:
     try:
-        keys_to_clear = ["segments", "order", "duration", "distance", "auto_gpt_input"]
+        keys_to_clear = ["leg_keys", "order", "duration", "distance", "auto_gpt_input", "recommended",
+                         "legs", "route_totals", "guides", "loaded_itinerary"]
         for k in keys_to_clear:
             if k in st.session_state:
-                if k in ["segments", "order"]:
+                if k in ["leg_keys", "order", "recommended"]:
                     st.session_state[k] = []
+                elif k in ["legs", "guides"]:
+                    st.session_state[k] = {}
+                elif k == "route_totals":
+                    st.session_state[k] = {"duration": 0.0, "distance": 0.0}
                 elif k in ["duration", "distance"]:
                     st.session_state[k] = 0.0
                 else:
                     st.session_state[k] = ""
         
-        widget_keys = ["mode_key", "start_key", "wps_key"]
+        widget_keys = ["mode_key", "start_key", "budget_key", "wps_key"]
         for widget_key in widget_keys:
             if widget_key in st.session_state:
                 del st.session_state[widget_key]
         
+        if "itinerary" in st.query_params:
+            del st.query_params["itinerary"]
+        
         st.success("✅ 초기화가 완료되었습니다.")
         st.rerun()
     except Exception as e:
@@ -487,6 +596,30 @@ with col2:
     st.markdown("---")
     st.metric("⏱️ 소요시간", f"{st.session_state.get('duration', 0.0):.1f}분")
     st.metric("📏 이동거리", f"{st.session_state.get('distance', 0.0):.2f}km")
+    
+    # 운영 지표는 사용자 화면이 아니라 로그로 (CHEONGPUNG_MEMORY_LOG=1)
+    session_utils.log_memory(st.session_state, route_store)
+    if not warm.ready:
+        progress = warm.snapshot()
+        st.caption(f"🔥 서버 예열 중 ({progress['finished']}/{progress['total']})")
+    
+    # 일정 공유: 번들로 저장하고 URL 에 ?itinerary=<id> 추가
+    if st.session_state.get("leg_keys") and st.button("🔗 경로 공유"):
+        try:
+            keys = st.session_state["leg_keys"]
+            legs = [(k, route_store.get(k)) for k in keys]
+            if any(leg is None for _, leg in legs):
+                st.warning("⚠️ 경로 정보가 만료되었습니다. 경로를 다시 생성해주세요.")
+            else:
+                bundle = itinerary.make_bundle(st.session_state["order"], keys[0][2], legs,
+                                               st.session_state["route_totals"], st.session_state["guides"])
+                bid = itinerary.save_bundle(bundle)
+                st.session_state["loaded_itinerary"] = bid
+                st.query_params["itinerary"] = bid
+                st.success("✅ 공유 링크가 만들어졌습니다.")
+                st.code(f"?itinerary={bid}")
+        except Exception as e:
+            st.error(f"❌ 경로 공유 중 오류: {str(e)}")
 
 # ------------------------------
 # ✅ [우] 지도
@@ -495,119 +628,71 @@ with col3:
     st.markdown('<div class="section-header">🗺️ 추천경로 지도시각화</div>', unsafe_allow_html=True)
     
     # 지도 설정
+    clat, clon = assets.map_center()
+
+    # 도로 스냅 좌표는 모든 관광지에 대해 프로세스당 한 번 계산 (예열 단계에서 미리)
     try:
-        ctr = boundary.geometry.centroid
-        clat, clon = float(ctr.y.mean()), float(ctr.x.mean())
-        if math.isnan(clat) or math.isnan(clon):
-            clat, clon = 36.64, 127.48
+        site_snaps = assets.snapped_sites()
     except Exception as e:
-        st.warning(f"중심점 계산 오류: {str(e)}")
-        clat, clon = 36.64, 127.48
-
-    @st.cache_data
-    def load_graph(lat, lon):
-        try:
-            return ox.graph_from_point((lat, lon), dist=3000, network_type="all")
-        except Exception as e:
-            st.warning(f"도로 네트워크 로드 실패: {str(e)}")
-            try:
-                return ox.graph_from_point((36.64, 127.48), dist=3000, network_type="all")
-            except:
-                return None
-
-    G = load_graph(clat, clon)
-    edges = None
-    
-    if G is not None:
-        try:
-            edges = ox.graph_to_gdfs(G, nodes=False)
-        except Exception as e:
-            st.warning(f"엣지 변환 실패: {str(e)}")
+        st.warning(f"도로 네트워크 로드 실패: {str(e)}")
+        site_snaps = {}
 
     stops = [start] + wps
     snapped = []
+    snapped_names = []
 
-    # 개선된 스냅핑
-    try:
-        for nm in stops:
+    for nm in stops:
+        try:
+            if nm in site_snaps:
+                snapped.append(site_snaps[nm])
+                snapped_names.append(nm)
+                continue
+            
             matching_rows = gdf[gdf["name"] == nm]
             if matching_rows.empty:
                 st.warning(f"⚠️ '{nm}' 정보를 찾을 수 없습니다.")
                 continue
             
             r = matching_rows.iloc[0]
-            
             if pd.isna(r.lon) or pd.isna(r.lat):
                 st.warning(f"⚠️ '{nm}'의 좌표 정보가 없습니다.")
                 continue
             
-            pt = Point(r.lon, r.lat)
-            
-            if edges is None or edges.empty:
-                snapped.append((r.lon, r.lat))
-                continue
-            
-            edges["d"] = edges.geometry.distance(pt)
-            if edges["d"].empty:
-                snapped.append((r.lon, r.lat))
-                continue
-            
-            ln = edges.loc[edges["d"].idxmin()]
-            sp = ln.geometry.interpolate(ln.geometry.project(pt))
-            snapped.append((sp.x, sp.y))
-            
-    except Exception as e:
-        st.error(f"❌ 지점 처리 중 오류: {str(e)}")
-        snapped = []
-        for nm in stops:
-            try:
-                r = gdf[gdf["name"] == nm].iloc[0]
-                if not (pd.isna(r.lon) or pd.isna(r.lat)):
-                    snapped.append((r.lon, r.lat))
-            except Exception as coord_error:
-                st.warning(f"⚠️ '{nm}' 좌표를 가져올 수 없습니다: {str(coord_error)}")
+            snapped.append((r.lon, r.lat))
+            snapped_names.append(nm)
+        except Exception as coord_error:
+            st.warning(f"⚠️ '{nm}' 좌표를 가져올 수 없습니다: {str(coord_error)}")
 
-    # 경로 생성 처리
+    fetch = worker_pool.fetch_leg if worker_pool is not None else routing.fetch_leg
+
+    # 경로 생성 처리 - 바뀐 구간만 다시 계산
     if create_clicked and len(snapped) >= 2:
         try:
-            segs, td, tl = [], 0.0, 0.0
             api_mode = "walking" if mode == "도보" else "driving"
+            # 복사본에서 계산하고 성공했을 때만 세션에 반영 (실패 시 기존 경로 유지)
+            legs = dict(st.session_state["legs"])
+            totals = dict(st.session_state["route_totals"])
+            keys = routing.plan_legs(snapped_names, api_mode)
+            coords = dict(zip(snapped_names, snapped))
+            itinerary.record_requests(keys)
             
-            for i in range(len(snapped) - 1):
-                x1, y1 = snapped[i]
-                x2, y2 = snapped[i + 1]
-                coord = f"{x1},{y1};{x2},{y2}"
-                
-                url = f"https://api.mapbox.com/directions/v5/mapbox/{api_mode}/{coord}"
-                params = {
-                    "geometries": "geojson",
-                    "overview": "full",
-                    "access_token": MAPBOX_TOKEN
-                }
-                
-                try:
-                    r = requests.get(url, params=params, timeout=10)
-                    if r.status_code == 200:
-                        data_resp = r.json()
-                        if data_resp.get("routes") and len(data_resp["routes"]) > 0:
-                            route = data_resp["routes"][0]
-                            segs.append(route["geometry"]["coordinates"])
-                            td += route.get("duration", 0)
-                            tl += route.get("distance", 0)
-                        else:
-                            st.warning(f"⚠️ 구간 {i+1}의 경로를 찾을 수 없습니다.")
-                    else:
-                        st.warning(f"⚠️ API 호출 실패 (상태코드: {r.status_code})")
-                except requests.exceptions.Timeout:
-                    st.warning("⚠️ API 호출 시간 초과")
-                except Exception as api_error:
-                    st.warning(f"⚠️ API 호출 오류: {str(api_error)}")
+            def warn_leg(key, err):
+                st.warning(f"⚠️ 구간 {keys.index(key) + 1}: {str(err)}")
+            
+            routing.update_legs(legs, totals, keys, coords, api_mode, MAPBOX_TOKEN, route_store,
+                                on_error=warn_leg, fetch=fetch)
             
-            if segs:
-                st.session_state["order"] = stops
-                st.session_state["duration"] = td / 60
-                st.session_state["distance"] = tl / 1000
-                st.session_state["segments"] = segs
+            if any(k in legs for k in keys):
+                st.session_state["legs"] = legs
+                st.session_state["route_totals"] = totals
+                st.session_state["order"] = snapped_names
+                st.session_state["duration"] = totals["duration"] / 60
+                st.session_state["distance"] = totals["distance"] / 1000
+                st.session_state["leg_keys"] = [k for k in keys if k in legs]
+                st.session_state["guides"] = {p: g for p, g in st.session_state["guides"].items()
+                                              if p in snapped_names}
+                if "itinerary" in st.query_params:
+                    del st.query_params["itinerary"]
                 st.success("✅ 경로가 성공적으로 생성되었습니다!")
                 st.rerun()
             else:
@@ -617,105 +702,41 @@ with col3:
             st.error(f"❌ 경로 생성 중 오류 발생: {str(e)}")
             st.info("💡 다른 출발지나 경유지를 선택해보세요.")
 
-    # 🔧 지도 렌더링 - 빈 박스 제거 최적화
+    # 🔧 지도 렌더링 - 작업 프로세스 풀에서 HTML 생성 (풀을 쓸 수 없으면 이 스레드에서)
     try:
-        m = folium.Map(
-            location=[clat, clon], 
-            zoom_start=12, 
-            tiles="CartoDB Positron",
-            # 🚨 추가 옵션으로 오버레이 방지
-            prefer_canvas=True,
-            control_scale=True
-        )
-        
-        if boundary is not None:
-            folium.GeoJson(boundary, style_function=lambda f: {
-                "color": "#9aa0a6",
-                "weight": 2,
-                "dashArray": "4,4",
-                "fillOpacity": 0.05
-            }).add_to(m)
-        
-        mc = MarkerCluster().add_to(m)
-        for _, row in gdf.iterrows():
-            if not (pd.isna(row.lat) or pd.isna(row.lon)):
-                folium.Marker([row.lat, row.lon], 
-                            popup=folium.Popup(str(row["name"]), max_width=200),
-                            tooltip=str(row["name"]),
-                            icon=folium.Icon(color="gray")).add_to(mc)
-        
         current_order = st.session_state.get("order", stops)
-        for idx, (x, y) in enumerate(snapped, 1):
-            if idx <= len(current_order):
-                place_name = current_order[idx - 1]
-            else:
-                place_name = f"지점 {idx}"
-            
-            folium.Marker([y, x], 
-                        icon=folium.Icon(color="red", icon="flag"),
-                        tooltip=f"{idx}. {place_name}",
-                        popup=folium.Popup(f"<b>{idx}. {place_name}</b>", max_width=200)
-            ).add_to(m)
+        stop_markers = [(x, y, current_order[i] if i < len(current_order) else f"지점 {i + 1}")
+                        for i, (x, y) in enumerate(snapped)]
+        leg_keys = st.session_state.get("leg_keys", [])
+        segments = route_store.segments(leg_keys)
+        if segments is None:
+            # 공유 저장소에서 밀려난 구간은 다시 계산 (일부 구간만 그리지 않도록)
+            coords = {**site_snaps, **dict(zip(snapped_names, snapped))}
+            if all(n in coords for k in leg_keys for n in k[:2]):
+                routing.update_legs(st.session_state["legs"], st.session_state["route_totals"], leg_keys,
+                                    coords, leg_keys[0][2], MAPBOX_TOKEN, route_store, fetch=fetch)
+                segments = route_store.segments(leg_keys)
+        if segments is None:
+            st.warning("⚠️ 경로 정보가 만료되었습니다. 경로를 다시 생성해주세요.")
+            segments = []
         
-        if st.session_state.get("segments"):
-            palette = ["#4285f4", "#34a853", "#ea4335", "#fbbc04", "#9c27b0", "#ff9800"]
-            segments = st.session_state["segments"]
-            
-            used_positions = []
-            min_distance = 0.001
-            
-            for i, seg in enumerate(segments):
-                if seg:
-                    folium.PolyLine([(pt[1], pt[0]) for pt in seg], 
-                                  color=palette[i % len(palette)], 
-                                  weight=5, 
-                                  opacity=0.8
-                    ).add_to(m)
-                    
-                    mid = seg[len(seg) // 2]
-                    candidate_pos = [mid[1], mid[0]]
-                    
-                    while any(abs(candidate_pos[0] - used[0]) < min_distance and 
-                            abs(candidate_pos[1] - used[1]) < min_distance 
-                            for used in used_positions):
-                        candidate_pos[0] += min_distance * 0.5
-                        candidate_pos[1] += min_distance * 0.5
-                    
-                    folium.map.Marker(candidate_pos,
-                        icon=DivIcon(html=f"<div style='background:{palette[i % len(palette)]};"
-                                        "color:#fff;border-radius:50%;width:28px;height:28px;"
-                                        "line-height:28px;text-align:center;font-weight:600;"
-                                        "box-shadow:0 2px 4px rgba(0,0,0,0.3);'>"
-                                        f"{i+1}</div>")
-                    ).add_to(m)
-                    
-                    used_positions.append(candidate_pos)
-            
+        map_html = None
+        if worker_pool is not None:
             try:
-                pts = [pt for seg in segments for pt in seg if seg]
-                if pts:
-                    m.fit_bounds([[min(p[1] for p in pts), min(p[0] for p in pts)],
-                                [max(p[1] for p in pts), max(p[0] for p in pts)]])
-            except:
-                m.location = [clat, clon]
-                m.zoom_start = 12
-        else:
-            m.location = [clat, clon]
-            m.zoom_start = 12
+                map_html = worker_pool.render_map([clat, clon], stop_markers, segments)
+            except Exception as pool_error:
+                drop_worker_pool(worker_pool, pool_error)
+        if map_html is None:
+            sites = gdf.dropna(subset=["lat", "lon"])
+            map_html = map_render.render_html([clat, clon], boundary, sites[["lat", "lon"]].to_numpy(),
+                                              sites["name"].astype(str).tolist(), stop_markers, segments)
         
         # 🚨 레이어 컨트롤 제거 - 빈 박스 원인 가능성
         # folium.LayerControl().add_to(m)
         
         # 🔧 지도 컨테이너 - 완전 수정된 구조
         st.markdown('<div class="map-container">', unsafe_allow_html=True)
-        map_data = st_folium(
-            m,
-            width="100%",
-            height=520,
-            returned_objects=[],  # 🚨 빈 객체 반환 방지
-            use_container_width=True,
-            key="main_map"
-        )
+        components.html(map_html, height=520)
         st.markdown('</div>', unsafe_allow_html=True)
         
     except Exception as map_error:
@@ -734,9 +755,6 @@ st.markdown('<div class="section-header">🤖 생성형 AI기반 관광 가이
 if st.button("🔁 방문 순서 자동 입력"):
     st.session_state["auto_gpt_input"] = ", ".join(st.session_state.get("order", []))
 
-if "messages" not in st.session_state:
-    st.session_state["messages"] = []
-
 with st.form("chat_form"):
     user_input = st.text_input("관광지명을 쉼표로 구분해서 입력하세요", 
                              value=st.session_state.get("auto_gpt_input", ""))
@@ -747,6 +765,7 @@ if submitted and user_input and client is not None:
         st.markdown("---")
         st.markdown("## ✨ 관광지별 상세 정보")
         
+        new_guides = {}
         for place in st.session_state["order"][:3]:
             try:
                 matched = data[data['t_name'].str.contains(place, na=False)]
@@ -754,20 +773,15 @@ if submitted and user_input and client is not None:
                 st.warning(f"데이터 검색 중 오류: {str(e)}")
                 matched = pd.DataFrame()
             
-            # GPT 간략 소개
-            gpt_intro = ""
-            try:
-                response = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "당신은 청주 지역의 문화 관광지를 간단하게 소개하는 관광 가이드입니다. "},
-                        {"role": "system", "content": "존댓말을 사용하세요."},
-                        {"role": "user", "content": f"{place}를 두 문단 이내로 간단히 설명해주세요."}
-                    ]
-                )
-                gpt_intro = response.choices[0].message.content
-            except Exception as e:
-                gpt_intro = f"❌ GPT 호출 실패: {place} 소개를 불러올 수 없어요. (오류: {str(e)})"
+            # GPT 간략 소개 (공유 일정이나 이전 요청에 있으면 재사용)
+            gpt_intro = st.session_state["guides"].get(place, "")
+            if not gpt_intro:
+                try:
+                    gpt_intro = guides.fetch_intro(client, place)
+                    st.session_state["guides"][place] = gpt_intro
+                    new_guides[place] = gpt_intro
+                except Exception as e:
+                    gpt_intro = f"❌ GPT 호출 실패: {place} 소개를 불러올 수 없어요. (오류: {str(e)})"
             
             score_text = ""
             review_block = ""
@@ -780,10 +794,9 @@ if submitted and user_input and client is not None:
                     score_text = f"📊**관광지 평점**: ⭐ {t_value[0]}" if len(t_value) > 0 else ""
                     
                     # 리뷰
-                    reviews = matched['t_review'].dropna().unique()
-                    reviews = [r for r in reviews if all(x not in str(r) for x in ["없음", "없읍"])]
+                    reviews = review_index.top_reviews(reviews_idx, "t", matched['t_name'].unique(), k=3)
                     if reviews:
-                        review_text = "\n".join([f'"{r}"' for r in reviews[:3]])
+                        review_text = "\n".join([f'"{r}"' for r in reviews])
                         review_block = review_text
                     
                     # 카페
@@ -817,6 +830,17 @@ if submitted and user_input and client is not None:
                 for review in review_block.split("\n"):
                     if review.strip():
                         st.markdown(f"- {review.strip('\"')}")
+        
+        # 공유된 일정이면 새로 받은 소개를 번들에도 저장해 다음 사용자는 GPT 호출 없이 보도록
+        shared_id = st.session_state.get("loaded_itinerary")
+        if new_guides and shared_id:
+            try:
+                bundle = itinerary.load_bundle(shared_id)
+                if bundle is not None and bundle["order"] == st.session_state["order"]:
+                    bundle["guides"].update(new_guides)
+                    itinerary.save_bundle(bundle)
+            except Exception as e:
+                st.warning(f"공유 일정 저장 중 오류: {str(e)}")
 
 elif submitted and user_input and client is None:
     st.error("❌ OpenAI 클라이언트가 초기화되지 않았습니다.")
@@ -0,0 +1,187 @@
+"""
+정적 자원 로드 (프로세스 단위 캐시)
+
+관광지·경계 shapefile, 리뷰 CSV, OSM 도로망과 관광지 스냅 좌표를
+프로세스당 한 번만 읽고 계산합니다. 앱과 예열(warmup) 스레드가 같은
+캐시를 쓰므로, 예열이 끝나면 첫 사용자도 기다리지 않습니다.
+
+도로망 엣지와 관광지 스냅 좌표는 가장 비싼 단계라서 `python warmup.py` 가
+cache/assets/ 에 저장해 두고, 앱 프로세스는 원본 파일(mtime)과 설정이 같으면
+OSM 다운로드·스냅 계산 없이 그 파일을 읽습니다.
+"""
+import math
+import os
+import threading
+from functools import lru_cache
+
+import geopandas as gpd
+import joblib
+import numpy as np
+import osmnx as ox
+import pandas as pd
+import shapely
+
+import recommend
+import review_index
+
+TOUR_PATH = "cb_tour.shp"
+BOUNDARY_PATH = "cb_shp.shp"
+DATA_PATH = "cj_data_final.csv"
+DEFAULT_CENTER = (36.64, 127.48)
+GRAPH_DIST = 3000
+
+ASSET_CACHE_DIR = os.path.join("cache", "assets")
+EDGES_PATH = os.path.join(ASSET_CACHE_DIR, "edges.joblib")
+SNAPS_PATH = os.path.join(ASSET_CACHE_DIR, "snapped_sites.joblib")
+ASSET_CACHE_VERSION = 1
+
+
+def _locked(fn):
+    """lru_cache + 함수별 락: 같은 자원을 여러 스레드가 동시에 처음 읽지 않도록."""
+    cached = lru_cache(maxsize=None)(fn)
+    lock = threading.Lock()
+
+    def wrapper(*args):
+        with lock:
+            return cached(*args)
+
+    wrapper.cache_clear = cached.cache_clear
+    wrapper.__doc__ = fn.__doc__
+    wrapper.__name__ = fn.__name__
+    return wrapper
+
+
+def _source_key():
+    """저장된 자원이 만들어진 조건: 원본 파일 mtime 과 도로망 설정."""
+    mtimes = {p: os.path.getmtime(p) if os.path.exists(p) else None for p in (TOUR_PATH, BOUNDARY_PATH)}
+    return {"version": ASSET_CACHE_VERSION, "sources": mtimes, "graph_dist": GRAPH_DIST}
+
+
+def _load_saved(path):
+    """저장된 자원을 읽습니다. 없거나 원본이 바뀌었으면 None."""
+    if not os.path.exists(path):
+        return None
+    try:
+        saved = joblib.load(path)
+    except Exception:
+        return None
+    if saved.get("key") != _source_key():
+        return None
+    return saved["value"]
+
+
+def _save(path, value):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    joblib.dump({"key": _source_key(), "value": value}, tmp, compress=3)
+    os.replace(tmp, path)
+
+
+def save_artifacts():
+    """
+    도로망 엣지와 스냅 좌표를 디스크에 남깁니다 (CLI 예열용).
+    도로망을 못 받았으면 스냅 좌표가 원래 좌표와 같으므로 저장하지 않고 False.
+    """
+    edges = load_edges()
+    if edges is None:
+        return False
+    _save(EDGES_PATH, edges)
+    _save(SNAPS_PATH, snapped_sites())
+    return True
+
+
+@_locked
+def load_sites():
+    gdf = gpd.read_file(TOUR_PATH).to_crs(epsg=4326)
+    gdf["lon"], gdf["lat"] = gdf.geometry.x, gdf.geometry.y
+    return gdf
+
+
+@_locked
+def load_boundary():
+    return gpd.read_file(BOUNDARY_PATH).to_crs(epsg=4326)
+
+
+@_locked
+def load_reviews():
+    return pd.read_csv(DATA_PATH, encoding="cp949").drop_duplicates()
+
+
+@_locked
+def load_review_index():
+    """미리 빌드된 파일(python review_index.py)이 없으면 즉석에서 만듭니다."""
+    index = review_index.load_index()
+    if index is None:
+        index = review_index.build_index(load_reviews())
+    return index
+
+
+@_locked
+def load_catalog():
+    """경유지 추천용 카탈로그 (평점·이동시간 행렬)."""
+    return recommend.build_catalog(load_sites(), load_reviews())
+
+
+@_locked
+def map_center():
+    try:
+        ctr = load_boundary().geometry.centroid
+        clat, clon = float(ctr.y.mean()), float(ctr.x.mean())
+        if not (math.isnan(clat) or math.isnan(clon)):
+            return clat, clon
+    except Exception:
+        pass
+    return DEFAULT_CENTER
+
+
+@_locked
+def load_graph(lat, lon):
+    """중심점 주변 도로망. 실패하면 기본 중심점으로 한 번 더 시도합니다."""
+    try:
+        return ox.graph_from_point((lat, lon), dist=GRAPH_DIST, network_type="all")
+    except Exception:
+        if (lat, lon) == DEFAULT_CENTER:
+            raise
+        return ox.graph_from_point(DEFAULT_CENTER, dist=GRAPH_DIST, network_type="all")
+
+
+@_locked
+def load_edges():
+    """도로망 엣지 GeoDataFrame (공간 인덱스 포함). 도로망이 없으면 None."""
+    edges = _load_saved(EDGES_PATH)
+    if edges is None:
+        try:
+            edges = ox.graph_to_gdfs(load_graph(*map_center()), nodes=False)
+        except Exception:
+            return None
+    if edges.empty:
+        return None
+    edges.sindex  # 공간 인덱스를 미리 만들어 둠
+    return edges
+
+
+def snap_points(lons, lats, edges=None):
+    """좌표들을 가장 가까운 도로 위 점으로 옮깁니다 (벡터 연산)."""
+    lons = np.asarray(lons, dtype=float)
+    lats = np.asarray(lats, dtype=float)
+    if edges is None:
+        edges = load_edges()
+    if edges is None or not len(lons):
+        return np.column_stack([lons, lats])
+
+    pts = shapely.points(lons, lats)
+    _, nearest = edges.sindex.nearest(pts, return_all=False)
+    lines = edges.geometry.values[nearest]
+    snapped = shapely.line_interpolate_point(lines, shapely.line_locate_point(lines, pts))
+    return np.column_stack([shapely.get_x(snapped), shapely.get_y(snapped)])
+
+
+@_locked
+def snapped_sites():
+    """모든 관광지의 도로 스냅 좌표: 이름 → (lon, lat)."""
+    saved = _load_saved(SNAPS_PATH)
+    if saved is not None:
+        return saved
+    gdf = load_sites().dropna(subset=["name", "lon", "lat"]).drop_duplicates(subset=["name"])
+    coords = snap_points(gdf["lon"].to_numpy(), gdf["lat"].to_numpy())
+    return {name: (float(x), float(y)) for name, (x, y) in zip(gdf["name"], coords)}
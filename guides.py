@@ -0,0 +1,41 @@
+"""
+관광지 GPT 소개 캐시 (프로세스 단위)
+
+같은 관광지 소개를 세션마다 다시 요청하지 않도록 모든 세션이 공유합니다.
+공유 일정 번들과 예열 단계에서 미리 채워 둘 수 있습니다.
+"""
+import threading
+
+GUIDE_MODEL = "gpt-3.5-turbo"
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def cached_intro(place):
+    with _lock:
+        return _cache.get(place)
+
+
+def put_intros(intros):
+    with _lock:
+        _cache.update({p: t for p, t in intros.items() if t})
+
+
+def fetch_intro(client, place):
+    """관광지 소개를 캐시에서 찾고, 없으면 GPT 로 받아 저장합니다. 실패 시 예외를 그대로 올립니다."""
+    text = cached_intro(place)
+    if text:
+        return text
+
+    response = client.chat.completions.create(
+        model=GUIDE_MODEL,
+        messages=[
+            {"role": "system", "content": "당신은 청주 지역의 문화 관광지를 간단하게 소개하는 관광 가이드입니다. "},
+            {"role": "system", "content": "존댓말을 사용하세요."},
+            {"role": "user", "content": f"{place}를 두 문단 이내로 간단히 설명해주세요."}
+        ]
+    )
+    text = response.choices[0].message.content
+    put_intros({place: text})
+    return text
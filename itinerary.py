@@ -0,0 +1,194 @@
+"""
+여행 일정 번들 (공유용)
+
+계산된 경로(방문 순서, 구간, 소요시간·거리, 관광지별 GPT 소개)를
+gzip JSON 한 파일로 저장합니다. 구간 좌표는 encoded polyline 으로 압축하고,
+파일 이름은 (방문 순서, 이동모드)에서 만든 짧은 해시라서
+같은 일정을 요청한 다른 사용자는 ?itinerary=<id> 로 바로 불러올 수 있습니다.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+BUNDLE_DIR = "bundles"
+BUNDLE_VERSION = 1
+POLYLINE_PRECISION = 5
+_ID_PATTERN = re.compile(r"^[0-9a-f]{12}$")
+
+REQUESTS_PATH = os.path.join(BUNDLE_DIR, "requests.json")
+_requests_lock = threading.Lock()
+_bundle_lock = threading.Lock()
+
+
+def encode_polyline(coords, precision=POLYLINE_PRECISION):
+    """[(lon, lat), ...] → Google encoded polyline 문자열."""
+    pts = np.asarray(coords, dtype=float).reshape(-1, 2)
+    if not len(pts):
+        return ""
+    ints = np.round(pts[:, ::-1] * 10 ** precision).astype(np.int64)
+    deltas = np.diff(ints, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    values = np.where(deltas < 0, ~(deltas << 1), deltas << 1)
+
+    out = []
+    for v in values.tolist():
+        while v >= 0x20:
+            out.append(chr((0x20 | (v & 0x1f)) + 63))
+            v >>= 5
+        out.append(chr(v + 63))
+    return "".join(out)
+
+
+def decode_polyline(text, precision=POLYLINE_PRECISION):
+    """encoded polyline 문자열 → (N, 2) [lon, lat] 배열."""
+    values, v, shift = [], 0, 0
+    for ch in text:
+        b = ord(ch) - 63
+        v |= (b & 0x1f) << shift
+        shift += 5
+        if b < 0x20:
+            values.append(~(v >> 1) if v & 1 else v >> 1)
+            v = shift = 0
+    pts = np.cumsum(np.array(values, dtype=np.int64).reshape(-1, 2), axis=0) / 10 ** precision
+    return pts[:, ::-1]
+
+
+def bundle_id(stops, mode):
+    key = json.dumps([list(stops), mode], ensure_ascii=False)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+def make_bundle(order, mode, legs, totals, guides=None):
+    """
+    order: 방문 순서, legs: [(구간 키, {"coords", "duration", "distance"}), ...],
+    totals: {"duration": 초, "distance": 미터}, guides: 관광지명 → 소개 텍스트
+    """
+    return {
+        "version": BUNDLE_VERSION,
+        "id": bundle_id(order, mode),
+        "order": list(order),
+        "mode": mode,
+        "duration": float(totals["duration"]),
+        "distance": float(totals["distance"]),
+        "legs": [
+            {
+                "from": src,
+                "to": dst,
+                "polyline": encode_polyline(leg["coords"]),
+                "duration": float(leg["duration"]),
+                "distance": float(leg["distance"]),
+            }
+            for (src, dst, _), leg in legs
+        ],
+        "guides": dict(guides or {}),
+    }
+
+
+def _path(bid, store_dir):
+    if not _ID_PATTERN.match(str(bid)):
+        raise ValueError(f"잘못된 일정 ID: {bid}")
+    return os.path.join(store_dir, f"{bid}.json.gz")
+
+
+def save_bundle(bundle, store_dir=BUNDLE_DIR):
+    """번들을 저장합니다. 같은 일정이 이미 있으면 관광지 소개는 합칩니다."""
+    os.makedirs(store_dir, exist_ok=True)
+    path = _path(bundle["id"], store_dir)
+    # 읽기 → 소개 합치기 → 교체를 한 번에 해야 동시 저장 시 소개가 사라지지 않음
+    with _bundle_lock:
+        existing = load_bundle(bundle["id"], store_dir)
+        if existing is not None:
+            bundle = dict(bundle, guides={**existing.get("guides", {}), **bundle.get("guides", {})})
+
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(bundle, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    return bundle["id"]
+
+
+def load_bundle(bid, store_dir=BUNDLE_DIR):
+    """저장된 번들을 읽습니다. 없거나 형식이 다르면 None."""
+    try:
+        path = _path(bid, store_dir)
+    except ValueError:
+        return None
+    if not os.path.exists(path):
+        return None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            bundle = json.load(f)
+    except Exception:
+        return None
+    if bundle.get("version") != BUNDLE_VERSION:
+        return None
+    return bundle
+
+
+def bundle_legs(bundle):
+    """번들의 구간들을 (구간 키, {"coords", "duration", "distance"}) 목록으로 풉니다."""
+    return [
+        ((leg["from"], leg["to"], bundle["mode"]), {
+            "coords": decode_polyline(leg["polyline"]),
+            "duration": leg["duration"],
+            "distance": leg["distance"],
+        })
+        for leg in bundle["legs"]
+    ]
+
+
+def list_bundles(store_dir=BUNDLE_DIR):
+    """저장된 번들 ID 목록 (최근 저장된 순)."""
+    if not os.path.isdir(store_dir):
+        return []
+    ids = (f[:-len(".json.gz")] for f in os.listdir(store_dir) if f.endswith(".json.gz"))
+    ids = [bid for bid in ids if _ID_PATTERN.match(bid)]
+
+    def mtime(bid):
+        try:
+            return os.path.getmtime(_path(bid, store_dir))
+        except OSError:
+            return 0.0
+    return sorted(ids, key=mtime, reverse=True)
+
+
+def _read_counts(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def record_requests(keys, path=REQUESTS_PATH):
+    """
+    구간 (출발, 도착, 이동모드) 요청 횟수를 누적합니다 (예열 대상 선정용).
+    통계일 뿐이라 디스크 오류는 무시하고 False 를 돌려줍니다 (경로 생성은 계속).
+    """
+    try:
+        with _requests_lock:
+            counts = _read_counts(path)
+            for key in keys:
+                k = json.dumps(list(key), ensure_ascii=False)
+                counts[k] = counts.get(k, 0) + 1
+
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(counts, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        return True
+    except (OSError, TypeError, ValueError):
+        return False
+
+
+def popular_legs(n=20, path=REQUESTS_PATH):
+    """가장 많이 요청된 구간 키 n 개."""
+    with _requests_lock:
+        counts = _read_counts(path)
+    top = sorted(counts.items(), key=lambda kv: kv[1], reverse=True)[:n]
+    return [tuple(json.loads(k)) for k, _ in top]
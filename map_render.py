@@ -0,0 +1,88 @@
+"""
+지도(folium) 생성
+
+Streamlit 에 의존하지 않는 순수 함수라서 앱 스레드에서도,
+작업 프로세스 풀(workers.py)에서도 같은 결과를 만듭니다.
+"""
+import folium
+import numpy as np
+from folium.features import DivIcon
+from folium.plugins import MarkerCluster
+
+PALETTE = ["#4285f4", "#34a853", "#ea4335", "#fbbc04", "#9c27b0", "#ff9800"]
+MIN_LABEL_DISTANCE = 0.001
+
+
+def build_map(center, boundary_geojson, site_coords, site_names, stops, segments):
+    """
+    center: [lat, lon], boundary_geojson: 경계 GeoJSON(dict/str) 또는 None,
+    site_coords: (N, 2) [lat, lon] 배열, site_names: 관광지명 목록,
+    stops: [(lon, lat, 이름), ...], segments: 구간별 (M, 2) [lon, lat] 배열 목록
+    """
+    clat, clon = center
+    m = folium.Map(
+        location=[clat, clon],
+        zoom_start=12,
+        tiles="CartoDB Positron",
+        # 🚨 추가 옵션으로 오버레이 방지
+        prefer_canvas=True,
+        control_scale=True
+    )
+
+    if boundary_geojson is not None:
+        folium.GeoJson(boundary_geojson, style_function=lambda f: {
+            "color": "#9aa0a6",
+            "weight": 2,
+            "dashArray": "4,4",
+            "fillOpacity": 0.05
+        }).add_to(m)
+
+    mc = MarkerCluster().add_to(m)
+    for (lat, lon), name in zip(np.asarray(site_coords).tolist(), site_names):
+        folium.Marker([lat, lon],
+                      popup=folium.Popup(str(name), max_width=200),
+                      tooltip=str(name),
+                      icon=folium.Icon(color="gray")).add_to(mc)
+
+    for idx, (x, y, place_name) in enumerate(stops, 1):
+        folium.Marker([float(y), float(x)],
+                      icon=folium.Icon(color="red", icon="flag"),
+                      tooltip=f"{idx}. {place_name}",
+                      popup=folium.Popup(f"<b>{idx}. {place_name}</b>", max_width=200)
+        ).add_to(m)
+
+    segments = [np.asarray(seg) for seg in segments if len(seg)]
+    if not segments:
+        return m
+
+    used_positions = []
+    for i, seg in enumerate(segments):
+        color = PALETTE[i % len(PALETTE)]
+        folium.PolyLine(seg[:, ::-1].tolist(), color=color, weight=5, opacity=0.8).add_to(m)
+
+        mid = seg[len(seg) // 2]
+        candidate_pos = [float(mid[1]), float(mid[0])]
+        while any(abs(candidate_pos[0] - used[0]) < MIN_LABEL_DISTANCE and
+                  abs(candidate_pos[1] - used[1]) < MIN_LABEL_DISTANCE
+                  for used in used_positions):
+            candidate_pos[0] += MIN_LABEL_DISTANCE * 0.5
+            candidate_pos[1] += MIN_LABEL_DISTANCE * 0.5
+
+        folium.map.Marker(candidate_pos,
+            icon=DivIcon(html=f"<div style='background:{color};"
+                              "color:#fff;border-radius:50%;width:28px;height:28px;"
+                              "line-height:28px;text-align:center;font-weight:600;"
+                              "box-shadow:0 2px 4px rgba(0,0,0,0.3);'>"
+                              f"{i+1}</div>")
+        ).add_to(m)
+        used_positions.append(candidate_pos)
+
+    pts = np.concatenate(segments)
+    (lon_min, lat_min), (lon_max, lat_max) = pts.min(axis=0), pts.max(axis=0)
+    m.fit_bounds([[float(lat_min), float(lon_min)], [float(lat_max), float(lon_max)]])
+    return m
+
+
+def render_html(*args):
+    """build_map 과 같은 인자로 완성된 HTML 문서를 돌려줍니다."""
+    return build_map(*args).get_root().render()
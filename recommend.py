@@ -0,0 +1,132 @@
+"""
+경유지 추천
+
+관광지 카탈로그(cb_tour.shp)에 평점(t_value)과 리뷰 수를 붙이고
+모든 관광지 간 예상 이동시간 행렬을 한 번 계산해 둔 뒤,
+출발지와 여행 시간이 주어지면 NumPy 벡터 연산으로 전체 후보를 채점합니다.
+
+cj_data_final.csv 는 관광지 × 카페 × 리뷰 조합마다 한 행이라서, 리뷰 수는
+행 수가 아니라 t_name 별 고유한(내용 있는) t_review 개수로 셉니다.
+관광지명은 t_name 과 정확히 일치할 때만 연결되며, 현재 cb_tour 46곳 중
+CSV 에 없는 곳(25곳)은 평점을 전체 평균(중립), 리뷰 수를 0 으로 둡니다.
+"""
+import numpy as np
+import pandas as pd
+
+from review_index import is_valid_review
+
+EARTH_RADIUS_KM = 6371.0
+DETOUR_FACTOR = 1.3          # 직선거리 → 도로거리 보정
+SPEED_KMH = {"driving": 30.0, "walking": 4.5}
+DWELL_MIN = 40.0             # 관광지당 체류시간(분)
+
+W_RATING = 0.6
+W_POPULARITY = 0.2
+W_TIME = 0.4
+
+
+def _haversine_matrix(lat, lon):
+    lat = np.radians(lat)
+    lon = np.radians(lon)
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def build_catalog(gdf, data):
+    """추천에 필요한 배열들을 미리 계산합니다 (앱 시작 시 한 번)."""
+    sites = gdf.dropna(subset=["name", "lat", "lon"]).drop_duplicates(subset=["name"])
+    names = sites["name"].astype(str).to_numpy()
+
+    t_name = data["t_name"].astype(str)
+    rating = pd.to_numeric(data["t_value"], errors="coerce").groupby(t_name).mean()
+    reviews = data.loc[data["t_review"].notna(), ["t_name", "t_review"]].astype(str)
+    reviews["t_review"] = reviews["t_review"].str.strip()
+    reviews = reviews[reviews["t_review"].map(is_valid_review)]
+    stats = pd.DataFrame({
+        "rating": rating,
+        "reviews": reviews.groupby("t_name")["t_review"].nunique(),
+    }).reindex(names)
+
+    rating = stats["rating"].to_numpy(dtype=float)
+    known = ~np.isnan(rating)
+    # CSV 에 없는 관광지는 평균 평점(중립)으로 취급해 거리·리뷰 수로만 비교되게
+    fallback = np.nanmean(rating) if known.any() else 3.0
+    rating = np.where(known, rating, fallback)
+
+    reviews = np.nan_to_num(stats["reviews"].to_numpy(dtype=float))
+    popularity = np.log1p(reviews)
+    if popularity.max() > 0:
+        popularity = popularity / popularity.max()
+
+    return {
+        "names": names,
+        "index": {n: i for i, n in enumerate(names)},
+        "rating": rating,
+        "has_rating": known,
+        "popularity": popularity,
+        "dist_km": _haversine_matrix(sites["lat"].to_numpy(dtype=float),
+                                     sites["lon"].to_numpy(dtype=float)) * DETOUR_FACTOR,
+    }
+
+
+def travel_minutes(catalog, mode="driving"):
+    return catalog["dist_km"] / SPEED_KMH.get(mode, SPEED_KMH["driving"]) * 60.0
+
+
+def recommend_waypoints(catalog, start, budget_min, mode="driving", k=5):
+    """
+    출발지에서 budget_min(분) 안에 둘러볼 수 있는 경유지를 추천합니다.
+    방문 순서대로 정렬된 DataFrame(name, rating, minutes, score)을 돌려줍니다.
+    """
+    columns = ["name", "rating", "minutes", "score"]
+    s = catalog["index"].get(str(start))
+    if s is None or budget_min <= 0:
+        return pd.DataFrame(columns=columns)
+
+    minutes = travel_minutes(catalog, mode)
+    from_start = minutes[s]
+
+    score = (W_RATING * catalog["rating"] / 5.0
+             + W_POPULARITY * catalog["popularity"]
+             - W_TIME * from_start / budget_min)
+    feasible = from_start + DWELL_MIN <= budget_min
+    feasible[s] = False
+    score = np.where(feasible, score, -np.inf)
+
+    ranked = np.argsort(-score, kind="stable")
+    ranked = ranked[np.isfinite(score[ranked])]
+
+    def visit_order(selected):
+        # 방문 순서는 출발지에서 가까운 곳부터 (최근접 이웃)
+        order, cur, left = [], s, list(selected)
+        while left:
+            nxt = min(left, key=lambda j: minutes[cur, j])
+            order.append(nxt)
+            left.remove(nxt)
+            cur = nxt
+        return order
+
+    def total_minutes(order):
+        path = [s] + order
+        return float(minutes[path[:-1], path[1:]].sum()) + DWELL_MIN * len(order)
+
+    # 점수 순으로 하나씩 담아 보고, 실제 방문 순서 기준으로 예산을 넘으면 뺌
+    chosen, order = [], []
+    for i in ranked:
+        candidate = visit_order(chosen + [i])
+        if total_minutes(candidate) > budget_min:
+            continue
+        chosen.append(i)
+        order = candidate
+        if len(chosen) == k:
+            break
+
+    order = np.array(order, dtype=int)
+    return pd.DataFrame({
+        "name": catalog["names"][order],
+        "rating": np.where(catalog["has_rating"][order], catalog["rating"][order], np.nan),
+        "minutes": from_start[order],
+        "score": score[order],
+    }, columns=columns)
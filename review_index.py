@@ -0,0 +1,152 @@
+"""
+리뷰 텍스트 관련도 인덱스 (TF-IDF)
+
+오프라인 단계에서 cj_data_final.csv 의 t_review / c_review 를 TF-IDF 행렬로
+만들어 디스크에 저장하고, 조회 시에는 장소별 행만 잘라
+희소행렬 연산 한 번으로 대표 리뷰를 고르고 거의 같은 리뷰를 걸러냅니다.
+
+    python review_index.py        # review_index.joblib 생성
+"""
+import os
+import re
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+DATA_PATH = "cj_data_final.csv"
+INDEX_PATH = "review_index.joblib"
+INDEX_VERSION = 1
+
+# 필드 약어 → (장소명 컬럼, 리뷰 컬럼)
+REVIEW_FIELDS = {
+    "t": ("t_name", "t_review"),
+    "c": ("c_name", "c_review"),
+}
+
+EMPTY_MARKERS = ["없음", "없읍"]
+DUP_THRESHOLD = 0.8      # 코사인 유사도가 이 이상이면 같은 리뷰로 간주
+MAX_CANDIDATES = 50      # 중복 제거 시 비교할 상위 후보 수
+MIN_INFO_LENGTH = 30     # 이 길이 이상이면 정보량 가중치 1.0
+
+
+def is_valid_review(text):
+    """'리뷰 없음', 'ㅡ' 처럼 내용이 없는 리뷰를 걸러냅니다."""
+    s = str(text).strip()
+    if not s or any(x in s for x in EMPTY_MARKERS):
+        return False
+    return re.search(r"[0-9A-Za-z가-힣]", s) is not None
+
+
+def _build_field(df, name_col, review_col):
+    pairs = df[[name_col, review_col]].dropna().astype(str)
+    pairs[review_col] = pairs[review_col].str.strip()
+    pairs = pairs.drop_duplicates()
+    pairs = pairs[pairs[review_col].map(is_valid_review)]
+
+    texts = pairs[review_col].to_numpy()
+    keys = pairs[name_col].to_numpy()
+    if len(texts) == 0:
+        return {"texts": texts, "scores": np.zeros(0), "matrix": sparse.csr_matrix((0, 0)), "groups": {}}
+
+    # 한국어는 형태소 분석기 없이 문자 n-gram 으로 충분히 구분됩니다.
+    vec = TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 3), sublinear_tf=True)
+    X = vec.fit_transform(texts).tocsr().astype(np.float32)
+
+    codes, uniques = pd.factorize(keys)
+    n = len(texts)
+
+    # 장소별 중심 벡터와의 유사도(대표성)를 한 번의 희소행렬 곱으로 계산
+    membership = sparse.csr_matrix(
+        (np.ones(n, dtype=np.float32), (codes, np.arange(n))), shape=(len(uniques), n)
+    )
+    centroids = normalize(membership @ X)
+    representativeness = np.asarray(X.multiply(centroids[codes]).sum(axis=1)).ravel()
+
+    lengths = pd.Series(texts).str.len().to_numpy()
+    info = np.minimum(lengths / MIN_INFO_LENGTH, 1.0)
+    scores = (representativeness * (0.5 + 0.5 * info)).astype(np.float32)
+
+    # 장소별 행 번호 (점수 내림차순으로 미리 정렬)
+    order = np.lexsort((-scores, codes))
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    groups = {str(k): order[bounds[i]:bounds[i + 1]] for i, k in enumerate(uniques)}
+
+    return {"texts": texts, "scores": scores, "matrix": X, "groups": groups}
+
+
+def build_index(df):
+    """데이터프레임에서 리뷰 인덱스를 만듭니다."""
+    return {
+        "version": INDEX_VERSION,
+        "fields": {f: _build_field(df, *cols) for f, cols in REVIEW_FIELDS.items()},
+    }
+
+
+def save_index(index, path=INDEX_PATH, source=DATA_PATH):
+    index = dict(index, source_mtime=os.path.getmtime(source) if os.path.exists(source) else None)
+    joblib.dump(index, path, compress=3)
+
+
+def load_index(path=INDEX_PATH, source=DATA_PATH):
+    """저장된 인덱스를 읽습니다. 없거나 원본 CSV 보다 오래되었으면 None."""
+    if not os.path.exists(path):
+        return None
+    try:
+        index = joblib.load(path)
+    except Exception:
+        return None
+    if index.get("version") != INDEX_VERSION:
+        return None
+    if os.path.exists(source) and index.get("source_mtime") != os.path.getmtime(source):
+        return None
+    return index
+
+
+def top_reviews(index, field, keys, k=3, threshold=DUP_THRESHOLD, within=None):
+    """
+    장소(들)의 리뷰 중 대표성이 높은 순으로 거의 같은 리뷰를 빼고 k개를 돌려줍니다.
+    within 에 리뷰 텍스트 목록을 주면 그 안에서만 고릅니다.
+    """
+    if index is None:
+        return []
+    fi = index["fields"][field]
+    if isinstance(keys, str):
+        keys = [keys]
+    parts = [fi["groups"][str(key)] for key in keys if str(key) in fi["groups"]]
+    if not parts:
+        return []
+
+    rows = np.concatenate(parts)
+    if within is not None:
+        allowed = [str(t).strip() for t in within if pd.notna(t)]
+        rows = rows[np.isin(fi["texts"][rows], allowed)]
+        if not len(rows):
+            return []
+    if len(parts) > 1:
+        rows = rows[np.argsort(-fi["scores"][rows], kind="stable")]
+    rows = rows[:MAX_CANDIDATES]
+
+    sub = fi["matrix"][rows]
+    sim = (sub @ sub.T).toarray()
+
+    picked = []
+    for i in range(len(rows)):
+        if picked and sim[i, picked].max() >= threshold:
+            continue
+        picked.append(i)
+        if len(picked) == k:
+            break
+    return [fi["texts"][rows[i]] for i in picked]
+
+
+if __name__ == "__main__":
+    df = pd.read_csv(DATA_PATH, encoding="cp949").drop_duplicates()
+    idx = build_index(df)
+    save_index(idx)
+    for f, fi in idx["fields"].items():
+        print(f"{REVIEW_FIELDS[f][1]}: 리뷰 {len(fi['texts'])}개, 장소 {len(fi['groups'])}곳")
+    print(f"✅ {INDEX_PATH} 저장 완료")
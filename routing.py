@@ -0,0 +1,164 @@
+"""
+구간(leg) 단위 경로 계산
+
+경로는 연속한 (출발, 도착, 이동모드) 구간들의 목록으로 관리합니다.
+경유지를 추가·삭제·재정렬하면 바뀐 구간만 Mapbox 로 다시 계산하고
+합계 시간·거리는 빠진 구간을 빼고 새 구간을 더해 갱신합니다.
+구간 좌표는 세션 간 공유되는 RouteStore 에 두고 세션에는 키만 보관합니다.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import requests
+
+MAPBOX_DIRECTIONS_URL = "https://api.mapbox.com/directions/v5/mapbox/{mode}/{coord}"
+
+
+class RouteError(Exception):
+    """한 구간의 경로를 가져오지 못했을 때 발생합니다."""
+
+
+def leg_key(src, dst, mode):
+    return (src, dst, mode)
+
+
+def plan_legs(names, mode):
+    """방문 순서대로 구간 키 목록을 만듭니다."""
+    return [leg_key(a, b, mode) for a, b in zip(names, names[1:])]
+
+
+def diff_legs(current, keys):
+    """
+    현재 보관 중인 구간(dict)과 새 구간 키 목록을 비교합니다.
+    (새로 계산할 키, 더 이상 쓰지 않는 키) 를 돌려줍니다.
+    """
+    wanted = set(keys)
+    missing = [k for k in dict.fromkeys(keys) if k not in current]
+    removed = [k for k in current if k not in wanted]
+    return missing, removed
+
+
+def fetch_leg(p1, p2, mode, token, timeout=10):
+    """
+    두 좌표((lon, lat)) 사이 경로를 Mapbox Directions API 로 가져옵니다.
+    {"coords": [[lon, lat], ...], "duration": 초, "distance": 미터} 를 돌려줍니다.
+    """
+    (x1, y1), (x2, y2) = p1, p2
+    url = MAPBOX_DIRECTIONS_URL.format(mode=mode, coord=f"{x1},{y1};{x2},{y2}")
+    params = {
+        "geometries": "geojson",
+        "overview": "full",
+        "access_token": token
+    }
+
+    try:
+        r = requests.get(url, params=params, timeout=timeout)
+    except requests.exceptions.Timeout:
+        raise RouteError("API 호출 시간 초과")
+    except Exception as e:
+        raise RouteError(f"API 호출 오류: {str(e)}")
+
+    if r.status_code != 200:
+        raise RouteError(f"API 호출 실패 (상태코드: {r.status_code})")
+
+    routes = r.json().get("routes") or []
+    if not routes:
+        raise RouteError("경로를 찾을 수 없습니다.")
+
+    route = routes[0]
+    return {
+        "coords": route["geometry"]["coordinates"],
+        "duration": float(route.get("duration", 0)),
+        "distance": float(route.get("distance", 0)),
+    }
+
+
+def update_legs(legs, totals, keys, coords, mode, token, store, on_error=None, fetch=fetch_leg):
+    """
+    세션의 legs(dict: 키 → (초, 미터))와 totals({"duration", "distance"})를
+    새 구간 키 목록에 맞게 제자리에서 갱신합니다. 좌표는 store 에만 저장됩니다.
+    coords 는 지점 이름 → (lon, lat), fetch 는 fetch_leg 와 같은 인터페이스의 함수.
+    Mapbox 로 새로 계산한 구간 수를 돌려줍니다.
+    """
+    missing, removed = diff_legs(legs, keys)
+
+    for k in removed:
+        duration, distance = legs.pop(k)
+        totals["duration"] -= duration
+        totals["distance"] -= distance
+
+    fetched = 0
+    for k in dict.fromkeys(keys):
+        leg = store.get(k)
+        if leg is None:
+            # 다른 세션이 이미 계산했으면 재사용, 없거나 저장소에서 밀려났으면 다시 계산
+            src, dst, _ = k
+            try:
+                leg = store.put(k, fetch(coords[src], coords[dst], mode, token))
+            except RouteError as e:
+                if on_error is not None:
+                    on_error(k, e)
+                continue
+            fetched += 1
+        if k in missing:
+            legs[k] = (leg["duration"], leg["distance"])
+            totals["duration"] += leg["duration"]
+            totals["distance"] += leg["distance"]
+
+    return fetched
+
+
+class RouteStore:
+    """
+    모든 세션이 함께 쓰는 구간 저장소 (LRU, 스레드 안전).
+    좌표는 float32 (N, 2) 배열로 압축해 보관하고, 세션에는 키만 남깁니다.
+    """
+
+    def __init__(self, max_legs=2000):
+        self.max_legs = max_legs
+        self._legs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._legs
+
+    def __len__(self):
+        return len(self._legs)
+
+    def get(self, key):
+        with self._lock:
+            leg = self._legs.get(key)
+            if leg is not None:
+                self._legs.move_to_end(key)
+            return leg
+
+    def put(self, key, leg):
+        leg = dict(leg, coords=np.asarray(leg["coords"], dtype=np.float32).reshape(-1, 2))
+        with self._lock:
+            self._legs[key] = leg
+            self._legs.move_to_end(key)
+            while len(self._legs) > self.max_legs:
+                self._legs.popitem(last=False)
+        return leg
+
+    def segments(self, keys):
+        """키 목록에 해당하는 좌표 배열들. 하나라도 저장소에서 빠졌으면 None."""
+        legs = [self.get(k) for k in keys]
+        if any(leg is None for leg in legs):
+            return None
+        return [leg["coords"] for leg in legs]
+
+    @property
+    def nbytes(self):
+        with self._lock:
+            return sum(leg["coords"].nbytes for leg in self._legs.values())
+
+
+_route_store = RouteStore()
+
+
+def get_route_store():
+    """프로세스 전체가 공유하는 구간 저장소."""
+    return _route_store
@@ -0,0 +1,68 @@
+"""
+세션 상태 관리 도우미
+
+- 세션별 메모리 사용량(대략치) 계산
+- 환경변수 CHEONGPUNG_MEMORY_LOG=1 로 실행하면 매 실행마다 세션 메모리와
+  프로세스 전체 수치(공유 경로 저장소, 최대 RSS)를 INFO 로그로 남깁니다.
+
+    CHEONGPUNG_MEMORY_LOG=1 streamlit run app.py
+"""
+import logging
+import os
+import resource
+import sys
+
+import numpy as np
+
+MEMORY_LOG_ENV = "CHEONGPUNG_MEMORY_LOG"
+
+logger = logging.getLogger("cheongpung.memory")
+
+
+def estimate_size(obj, _seen=None):
+    """객체가 차지하는 메모리(바이트)를 재귀적으로 어림합니다."""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj) + (0 if obj.base is not None else obj.nbytes)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k, _seen) + estimate_size(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(v, _seen) for v in obj)
+    return size
+
+
+def session_memory_report(state):
+    """세션 상태 키별 메모리 사용량 (바이트, 큰 순서)."""
+    report = {k: estimate_size(state[k]) for k in state.keys()}
+    return dict(sorted(report.items(), key=lambda kv: kv[1], reverse=True))
+
+
+def memory_log_enabled():
+    """환경변수로 켰을 때만 로그 핸들러를 붙입니다 (Streamlit 은 앱 로거를 설정하지 않음)."""
+    if os.getenv(MEMORY_LOG_ENV) != "1":
+        return False
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return True
+
+
+def log_memory(state, store):
+    """세션 메모리(큰 키 5개)와 프로세스 수치(경로 저장소, 최대 RSS)를 남깁니다."""
+    if not memory_log_enabled():
+        return
+    mem = session_memory_report(state)
+    top = ", ".join(f"{k}={v / 1024:.1f}KB" for k, v in list(mem.items())[:5])
+    # ru_maxrss 는 리눅스에서 KB 단위
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    logger.info("세션 %.1fKB (%s) | 프로세스: 경로 저장소 %.0fKB (%d구간), 최대 RSS %.0fMB",
+                sum(mem.values()) / 1024, top, store.nbytes / 1024, len(store), max_rss / 1024)
@@ -0,0 +1,311 @@
+"""
+예열(warm-up)
+
+배포 직후 첫 사용자가 CSV 파싱, shapefile 읽기, OSM 도로망 다운로드,
+Mapbox/GPT 첫 호출을 모두 떠안지 않도록 미리 채워 둡니다.
+
+- 앱 안에서는 첫 세션이 스크립트를 실행할 때 백그라운드 스레드로 시작되어
+  assets / RouteStore / guides 캐시를 채웁니다.
+- Streamlit 은 첫 접속 전에는 app.py 를 실행하지 않으므로, 배포 시에는 CLI 를
+  먼저 실행해 디스크 캐시(리뷰 인덱스, 도로망 엣지·스냅 좌표, 인기 구간 번들)를
+  채워 둡니다. 앱 프로세스는 그 파일들을 읽어 첫 사용자도 오래 기다리지 않습니다.
+- 예열 상태는 프로세스마다 bundles/warmup_status.<pid>.json 에 기록되고,
+  --status 는 살아 있는 앱 프로세스의 상태만 봅니다.
+
+    python warmup.py              # 디스크 캐시 예열 (진행 상황 출력)
+    python warmup.py --status     # 실행 중인 앱 프로세스들의 예열 상태 확인
+"""
+import argparse
+import glob
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import assets
+import guides
+import itinerary
+import review_index
+import routing
+
+STATUS_PATTERN = os.path.join(itinerary.BUNDLE_DIR, "warmup_status.{pid}.json")
+TOP_LEGS = 20
+MAX_WORKERS = 4
+BUNDLE_SHARE = 0.5       # 저장된 번들로 채울 RouteStore 용량 비율 (인기 구간이 밀려나지 않게)
+
+PENDING, RUNNING, DONE, FAILED, SKIPPED = "대기", "진행 중", "완료", "실패", "건너뜀"
+
+
+class Warmup:
+    """예열 단계를 순서대로 실행하고 진행 상황을 기록합니다."""
+
+    def __init__(self, token=None, client=None, top_n=TOP_LEGS, persist=False, source="app", status_path=None):
+        self.token = token
+        self.client = client
+        self.top_n = top_n
+        self.persist = persist
+        self.source = source
+        self.status_path = status_path or STATUS_PATTERN.format(pid=os.getpid())
+
+        self.steps = [
+            ("sites", "관광지 shapefile", self._sites),
+            ("reviews", "리뷰 CSV · 리뷰 인덱스 · 추천 카탈로그", self._reviews),
+            ("graph", "OSM 도로망", self._graph),
+            ("snaps", "관광지 도로 스냅", self._snaps),
+            ("routes", "인기 구간 경로", self._routes),
+            ("bundles", "저장된 일정 번들", self._bundles),
+            ("guides", "인기 관광지 소개", self._guides),
+        ]
+        self.status = {name: PENDING for name, _, _ in self.steps}
+        self.errors = {}
+        self.started_at = None
+        self.finished_at = None
+        self._popular = []
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = None
+
+    # ── 진행 상황 ──────────────────────────
+    @property
+    def ready(self):
+        return self.finished_at is not None
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def snapshot(self):
+        with self._lock:
+            finished = sum(s in (DONE, FAILED, SKIPPED) for s in self.status.values())
+            return {
+                "pid": os.getpid(),
+                "source": self.source,
+                "ready": self.ready,
+                "finished": finished,
+                "total": len(self.steps),
+                "steps": dict(self.status),
+                "errors": dict(self.errors),
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+
+    def _set(self, name, status, error=None):
+        with self._lock:
+            self.status[name] = status
+            if error is not None:
+                self.errors[name] = error
+        self._write_status()
+
+    def _write_status(self):
+        if not self.status_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.status_path) or ".", exist_ok=True)
+            tmp = f"{self.status_path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.status_path)
+        except OSError:
+            pass
+
+    # ── 실행 ──────────────────────────────
+    def run(self, on_progress=None):
+        self.started_at = time.time()
+        for name, label, fn in self.steps:
+            self._set(name, RUNNING)
+            try:
+                status = fn() or DONE
+                self._set(name, status)
+            except Exception as e:
+                self._set(name, FAILED, str(e))
+            if on_progress is not None:
+                on_progress(name, label, self.status[name], self.errors.get(name))
+        self.finished_at = time.time()
+        self._write_status()
+        self._done.set()
+        return self
+
+    def start(self):
+        """백그라운드 스레드에서 실행합니다 (프로세스당 한 번)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    # ── 단계 ──────────────────────────────
+    def _sites(self):
+        assets.load_sites()
+        assets.load_boundary()
+        assets.map_center()
+
+    def _reviews(self):
+        assets.load_reviews()
+        index = assets.load_review_index()
+        assets.load_catalog()
+        if self.persist and review_index.load_index() is None:
+            review_index.save_index(index)
+
+    def _graph(self):
+        # load_edges 가 도로망을 받아 엣지로 바꾸고 결과(실패 시 None)를 캐시합니다.
+        if assets.load_edges() is None:
+            raise RuntimeError("도로망 엣지가 비어 있습니다.")
+
+    def _snaps(self):
+        assets.snapped_sites()
+        if self.persist and not assets.save_artifacts():
+            raise RuntimeError("도로망이 없어 스냅 좌표를 저장하지 않았습니다.")
+
+    def _bundles(self):
+        # 인기 구간을 먼저 채운 뒤, 최근 번들부터 저장소 용량의 일부까지만 읽음
+        store = routing.get_route_store()
+        limit = int(store.max_legs * BUNDLE_SHARE)
+        for bid in itinerary.list_bundles():
+            bundle = itinerary.load_bundle(bid)
+            if bundle is None:
+                continue
+            legs = [(key, leg) for key, leg in itinerary.bundle_legs(bundle) if key not in store]
+            if len(store) + len(legs) > limit:
+                break
+            for key, leg in legs:
+                store.put(key, leg)
+            guides.put_intros(bundle.get("guides", {}))
+
+    def _routes(self):
+        self._popular = itinerary.popular_legs(self.top_n)
+        if not self._popular:
+            return SKIPPED
+        store = routing.get_route_store()
+        for key in self._popular:
+            if key not in store:
+                self._load_leg_bundle(key, store)
+        coords = assets.snapped_sites()
+        todo = [k for k in self._popular if k not in store and k[0] in coords and k[1] in coords]
+        if todo and not self.token:
+            return SKIPPED
+
+        def fetch(key):
+            src, dst, mode = key
+            store.put(key, routing.fetch_leg(coords[src], coords[dst], mode, self.token))
+
+        # Mapbox 호출은 I/O 대기라서 스레드로 동시에
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            failed = [e for e in pool.map(self._try, [fetch] * len(todo), todo) if e]
+        if failed:
+            raise RuntimeError(f"{len(failed)}개 구간 실패: {failed[0]}")
+
+    @staticmethod
+    def _load_leg_bundle(key, store):
+        """CLI 가 _save_popular_bundles 로 남긴 2지점 번들에서 구간을 읽습니다."""
+        src, dst, mode = key
+        bundle = itinerary.load_bundle(itinerary.bundle_id([src, dst], mode))
+        if bundle is None:
+            return
+        for k, leg in itinerary.bundle_legs(bundle):
+            if k == key:
+                store.put(k, leg)
+        guides.put_intros(bundle.get("guides", {}))
+
+    def _guides(self):
+        places = list(dict.fromkeys(p for src, dst, _ in self._popular for p in (src, dst)))
+        if not places:
+            return SKIPPED
+        todo = [p for p in places if not guides.cached_intro(p)]
+
+        def fetch(place):
+            guides.fetch_intro(self.client, place)
+
+        failed = []
+        if todo and self.client is not None:
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+                failed = [e for e in pool.map(self._try, [fetch] * len(todo), todo) if e]
+
+        if self.persist:
+            self._save_popular_bundles()
+        if failed:
+            raise RuntimeError(f"{len(failed)}개 관광지 소개 실패: {failed[0]}")
+        if todo and self.client is None:
+            return SKIPPED
+
+    def _save_popular_bundles(self):
+        """CLI 예열 결과를 2지점 일정 번들로 남겨 앱 프로세스가 시작할 때 읽도록 합니다."""
+        store = routing.get_route_store()
+        for key in self._popular:
+            leg = store.get(key)
+            if leg is None:
+                continue
+            src, dst, mode = key
+            intros = {p: guides.cached_intro(p) for p in (src, dst) if guides.cached_intro(p)}
+            totals = {"duration": leg["duration"], "distance": leg["distance"]}
+            itinerary.save_bundle(itinerary.make_bundle([src, dst], mode, [(key, leg)], totals, intros))
+
+    @staticmethod
+    def _try(fn, arg):
+        try:
+            fn(arg)
+            return None
+        except Exception as e:
+            return str(e)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def read_statuses(pattern=STATUS_PATTERN):
+    """살아 있는 프로세스들의 예열 상태 목록. 끝난 프로세스의 기록은 지웁니다."""
+    statuses = []
+    for path in sorted(glob.glob(pattern.format(pid="*"))):
+        try:
+            with open(path, encoding="utf-8") as f:
+                status = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if not _alive(status.get("pid", -1)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        statuses.append(status)
+    return statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="청풍로드 예열")
+    parser.add_argument("--status", action="store_true", help="예열 상태만 출력")
+    parser.add_argument("--top", type=int, default=TOP_LEGS, help="예열할 인기 구간 수")
+    args = parser.parse_args()
+
+    if args.status:
+        servers = [s for s in read_statuses() if s.get("source") == "app"]
+        if not servers:
+            print("예열 중인 앱 프로세스가 없습니다.")
+            raise SystemExit(1)
+        print(json.dumps(servers, ensure_ascii=False, indent=2))
+        raise SystemExit(0 if all(s["ready"] for s in servers) else 1)
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    client = None
+    if os.getenv("OPENAI_API_KEY"):
+        import openai
+        client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+    def report(name, label, status, error):
+        print(f"[{status}] {label}" + (f" - {error}" if error else ""))
+
+    warm = Warmup(token=os.getenv("MAPBOX_TOKEN"), client=client, top_n=args.top, persist=True,
+                  source="cli")
+    warm.run(on_progress=report)
+    snap = warm.snapshot()
+    print(f"✅ 예열 완료 ({snap['finished_at'] - snap['started_at']:.1f}초)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+작업 프로세스 풀
+
+지도 HTML 생성과 경계 단순화처럼 GIL 을 오래 잡는 shapely/folium 작업을
+프로세스 풀로 넘겨 동시 사용자 수가 늘어도 코어 수만큼 처리량이 늘도록 합니다.
+
+- 관광지 좌표·이름과 단순화한 경계 같은 읽기 전용 자료는 작업 프로세스가 시작할 때
+  한 번만 받아 두고, 작업마다 보내는 것은 정류지와 구간 좌표뿐입니다.
+- 같은 키의 작업이 이미 진행 중이면 새로 제출하지 않고 그 결과를 함께 기다립니다
+  (요청 합치기). Mapbox 구간 요청처럼 I/O 대기인 작업은 스레드 풀에서 같은 방식으로 처리합니다.
+  스레드 풀은 프로세스 전체가 같이 쓰므로, 프로세스 풀이 망가져 새로 만들어도 영향이 없습니다.
+- 작업 프로세스는 풀을 만들 때 한꺼번에 띄우고, 그동안 __main__ 을 빈 모듈로 바꿔 둬서
+  spawn 된 프로세스가 app.py 를 다시 실행(자료 로딩·예열·API 호출)하지 않게 합니다.
+"""
+import atexit
+import contextlib
+import hashlib
+import json
+import os
+import pickle
+import sys
+import threading
+import types
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from multiprocessing import get_context
+
+import numpy as np
+import shapely
+
+import map_render
+import routing
+
+MAX_WORKERS = max(1, min(4, os.cpu_count() or 1))
+MAX_IO_WORKERS = 8
+RESULT_CACHE_SIZE = 64
+START_TIMEOUT = 60            # 작업 프로세스 시작(경계 단순화 포함) 대기 시간(초)
+RETRY_AFTER = 300             # 풀 시작에 실패하면 이 시간(초) 동안은 다시 만들지 않음
+BOUNDARY_TOLERANCE = 0.0005   # 약 50m (경위도 단위)
+
+
+# ── 작업 프로세스 쪽 ─────────────────────
+_worker = {}
+
+
+def simplify_job(boundary_wkb, tolerance=BOUNDARY_TOLERANCE):
+    """경계 도형(WKB 목록)을 단순화해 GeoJSON FeatureCollection 으로 돌려줍니다."""
+    geoms = shapely.simplify(shapely.from_wkb(boundary_wkb), tolerance, preserve_topology=True)
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "properties": {}, "geometry": json.loads(shapely.to_geojson(g))}
+            for g in geoms
+        ],
+    }
+
+
+def _init_worker(site_coords, site_names, boundary_wkb):
+    _worker.update(
+        sites=site_coords,
+        site_names=site_names,
+        boundary=simplify_job(boundary_wkb) if boundary_wkb else None,
+    )
+
+
+def _ready():
+    return os.getpid()
+
+
+def render_map_job(center, stops, segments):
+    """관광지·경계는 작업 프로세스가 시작할 때 받은 자료를 쓰고, 지도 HTML 을 돌려줍니다."""
+    return map_render.render_html(center, _worker["boundary"], _worker["sites"],
+                                  _worker["site_names"], stops, segments)
+
+
+def route_job(p1, p2, mode, token):
+    return routing.fetch_leg(p1, p2, mode, token)
+
+
+# ── 앱 쪽 ──────────────────────────────
+_spawn_lock = threading.Lock()
+_io_lock = threading.Lock()
+_io_threads = None
+
+
+def _io_executor():
+    """I/O 작업용 스레드 풀 (프로세스당 하나, 종료 시 정리)."""
+    global _io_threads
+    with _io_lock:
+        if _io_threads is None:
+            _io_threads = ThreadPoolExecutor(max_workers=MAX_IO_WORKERS, thread_name_prefix="io")
+            atexit.register(_io_threads.shutdown, wait=False, cancel_futures=True)
+        return _io_threads
+
+
+@contextlib.contextmanager
+def _bare_main():
+    """
+    프로세스를 띄우는 동안 __main__ 을 __file__ 없는 빈 모듈로 바꿔 둡니다.
+    spawn 은 __main__ 의 파일을 작업 프로세스에서 __mp_main__ 으로 다시 실행하는데,
+    Streamlit 에서는 그게 app.py 전체입니다.
+    """
+    with _spawn_lock:
+        main = sys.modules["__main__"]
+        sys.modules["__main__"] = types.ModuleType("__main__")
+        try:
+            yield
+        finally:
+            sys.modules["__main__"] = main
+
+
+def job_key(*parts):
+    """작업 인자로 요청 합치기/결과 캐시용 키를 만듭니다."""
+    return hashlib.sha1(pickle.dumps(parts, protocol=4)).hexdigest()
+
+
+class WorkerPool:
+    """
+    CPU 작업은 프로세스 풀, I/O 작업은 프로세스 공용 스레드 풀에서 실행합니다.
+    같은 키로 진행 중인 작업은 하나의 Future 를 공유합니다.
+    """
+
+    def __init__(self, site_coords, site_names, boundary_wkb=None, max_workers=MAX_WORKERS):
+        self._procs = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(np.asarray(site_coords, dtype=np.float64).reshape(-1, 2), list(site_names), boundary_wkb),
+        )
+        self._threads = _io_executor()
+        self._inflight = {}
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+        # 작업 프로세스는 submit 할 때 하나씩 뜨므로, 지금 작업 수만큼 제출해 모두 띄워 둠
+        # (요청 처리 중에 새 프로세스가 뜨면 그때는 __main__ 을 바꿀 수 없음)
+        try:
+            with _bare_main():
+                started = [self._procs.submit(_ready) for _ in range(max_workers)]
+            for fut in started:
+                fut.result(START_TIMEOUT)
+        except Exception:
+            self.shutdown()
+            raise
+        atexit.register(self.shutdown)
+
+    def submit(self, key, fn, *args, io=False):
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self.coalesced += 1
+                return fut
+            executor = self._threads if io else self._procs
+            fut = executor.submit(fn, *args)
+            self._inflight[key] = fut
+        fut.add_done_callback(lambda f: self._forget(key, f))
+        return fut
+
+    def _forget(self, key, fut):
+        with self._lock:
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+
+    def run(self, key, fn, *args, io=False, cache=False, timeout=None):
+        """작업 결과를 기다립니다. cache=True 면 최근 결과를 키로 기억해 재사용합니다."""
+        if cache:
+            with self._lock:
+                if key in self._results:
+                    self._results.move_to_end(key)
+                    return self._results[key]
+
+        result = self.submit(key, fn, *args, io=io).result(timeout)
+
+        if cache:
+            with self._lock:
+                self._results[key] = result
+                while len(self._results) > RESULT_CACHE_SIZE:
+                    self._results.popitem(last=False)
+        return result
+
+    def render_map(self, center, stops, segments, timeout=30):
+        args = (list(center), [tuple(s) for s in stops], [np.asarray(s) for s in segments])
+        return self.run(job_key("map", *args), render_map_job, *args, cache=True, timeout=timeout)
+
+    def fetch_leg(self, p1, p2, mode, token, timeout=15):
+        """routing.fetch_leg 와 같은 인터페이스. 같은 구간 요청은 하나로 합칩니다."""
+        key = job_key("leg", tuple(p1), tuple(p2), mode)
+        try:
+            return self.run(key, route_job, p1, p2, mode, token, io=True, timeout=timeout)
+        except FutureTimeout:
+            raise routing.RouteError("API 호출 시간 초과")
+        except (RuntimeError, CancelledError):
+            # 스레드 풀이 닫혔거나(프로세스 종료 중) 작업이 취소되면 직접 호출
+            return routing.fetch_leg(p1, p2, mode, token)
+
+    def shutdown(self):
+        """프로세스 풀만 닫습니다. 스레드 풀은 다른 세션이 계속 쓰므로 그대로 둡니다."""
+        self._procs.shutdown(wait=False, cancel_futures=True)